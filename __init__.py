@@ -2,16 +2,29 @@
 client designed to encapsulate and simplify the TWS API.
 
 """
+import asyncio
 import logging
+import os
 
 
 # Default log level
 LOG_LEVEL = logging.INFO
 
+# True once configure_logging() has run
+_CONFIGURED = False
+
 
 def configure_logging():
-    """Configure the default logger for this package."""
-    logger = logging.getLogger()
+    """Configure the default logger for this package. Only the package's own
+    logger is touched (never the root logger) so a host application's
+    logging configuration is left intact, and repeated calls do not stack
+    handlers.
+
+    """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    logger = logging.getLogger(__name__)
     logger.setLevel(LOG_LEVEL)
     handler = logging.NullHandler()
     line1 = '%(asctime)s %(levelname)s %(name)s %(funcName)s():'
@@ -19,7 +32,19 @@ def configure_logging():
     formatter = logging.Formatter('{0}\n{1}'.format(line1, line2))
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+    _CONFIGURED = True
 
 
 # Setup logging
 configure_logging()
+
+# Use uvloop for the event loop when it is available. The libuv-based loop
+# cuts per-iteration overhead considerably on tick-heavy sessions and needs
+# no changes from callers since Client defers to the default policy. Set
+# IBCLIENTPY_NO_UVLOOP to keep the stock asyncio loop.
+if 'IBCLIENTPY_NO_UVLOOP' not in os.environ:
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
@@ -2,10 +2,12 @@
 [ideally] simpler API for interacting with TWS.
 
 """
-from asyncio import Future
+from collections import OrderedDict, deque
 import asyncio
+import itertools
 import logging
-import ibapipy.data.contract as ibc
+import threading
+import time
 import ibapipy.data.execution_filter as ibef
 import ibclientpy.client_adapter as ibca
 import ibclientpy.historical_data as ibhd
@@ -15,6 +17,17 @@ import ibclientpy.config as config
 
 LOG = logging.getLogger(__name__)
 
+# Empty "match everything" filter reused by get_orders; the adapter only
+# serializes the filter, so one shared instance is safe.
+EMPTY_EXEC_FILTER = ibef.ExecutionFilter()
+
+# Shared background event loop (and its thread) used by run_sync() so that
+# synchronous callers reuse one loop and connection state instead of paying
+# loop spin-up and reconnect costs per call
+SYNC_LOOP = None
+SYNC_LOOP_THREAD = None
+SYNC_LOOP_LOCK = threading.Lock()
+
 
 class Client:
     """Simplified interface to an ibapipy.client_socket.ClientSocket.
@@ -22,11 +35,23 @@ class Client:
     Attributes not specified in the constructor:
     adapter       -- ibclientpy.client_adapter.ClientAdapter object that
                      provides access to the ibapipy ClientSocket
-    next_id       -- next available request ID
+    next_id       -- next valid request ID as reported by TWS at connect
+                     time
+    id_iter       -- iterator yielding fresh request IDs
     id_contracts  -- dictionary of contracts by request ID
 
     """
 
+    # The attribute set is fixed, so __slots__ gives offset-based attribute
+    # access on the dispatch paths and drops the per-instance dict.
+    # Subclasses (e.g. OfflineClient) may still add attributes; they get an
+    # instance dict of their own.
+    __slots__ = ('loop', 'adapter', 'conn_lock', 'next_id', 'id_iter',
+                 'id_contracts', 'order_handler', 'orders_lock',
+                 'history_pending', 'history_remaining', 'history_sem',
+                 'history_task', 'history_order', 'history_done',
+                 'contract_cache', 'contract_inflight', '__weakref__')
+
     def __init__(self, loop=None):
         """Initialize a new instance of a Client.
 
@@ -36,18 +61,39 @@ class Client:
         """
         self.loop = loop
         self.adapter = ibca.ClientAdapter(self, loop)
+        # Serializes connect/disconnect so concurrent calls cannot race two
+        # full handshakes
+        self.conn_lock = asyncio.Lock()
         self.next_id = -1
+        self.id_iter = itertools.count(1)
         self.id_contracts = {}
         self.order_handler = iboh.OrderHandler(self)
-        self.history_pending = []
+        # Serializes get_orders; the adapter keeps a single executions/orders
+        # rendezvous which overlapping calls would overwrite
+        self.orders_lock = asyncio.Lock()
+        self.history_pending = deque()
+        self.history_remaining = 0
+        self.history_sem = None
+        self.history_task = None
+        # Request IDs in submission (chronological) order and completed
+        # blocks awaiting in-order delivery; overlapping requests may
+        # finish out of order
+        self.history_order = deque()
+        self.history_done = {}
+        # Resolved contracts by (sec_type, symbol, currency, exchange) key;
+        # values are (timestamp, contract) tuples in least-recently-used
+        # order
+        self.contract_cache = OrderedDict()
+        # In-flight contract detail requests by the same key; duplicate
+        # concurrent callers await the first caller's future
+        self.contract_inflight = {}
 
     # *************************************************************************
     # Connection
     # *************************************************************************
 
-    @asyncio.coroutine
-    def connect(self, host=config.HOST, port=config.PORT,
-                client_id=config.CLIENT_ID):
+    async def connect(self, host=config.HOST, port=config.PORT,
+                      client_id=config.CLIENT_ID):
         """Connect to the remote TWS.
 
         Keyword arguments:
@@ -56,28 +102,87 @@ class Client:
         client_id -- number used to identify this client connection
 
         """
-        if self.is_connected():
-            return
-        yield from self.adapter.connect(host, port, client_id)
-        # Automatically associate newly opened TWS orders with this client
-        if client_id == 0:
-            yield from self.adapter.req_auto_open_orders(True)
-        # Wait for the next ID to get updated
-        self.next_id = yield from self.get_next_valid_id()
-
-    @asyncio.coroutine
-    def disconnect(self):
+        async with self.conn_lock:
+            if self.is_connected():
+                return
+            id_future = await self.adapter.connect(host, port, client_id)
+            # Automatically associate newly opened TWS orders with this
+            # client
+            if client_id == 0:
+                await self.adapter.req_auto_open_orders(True)
+            # TWS pushes the first valid ID right after the handshake; only
+            # pay an explicit round trip if it fails to arrive
+            try:
+                self.next_id = await asyncio.wait_for(
+                    id_future, config.CONNECT_ID_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.next_id = await self.get_next_valid_id()
+            self.id_iter = itertools.count(self.next_id)
+
+    async def disconnect(self):
         """Disconnect from the remote TWS."""
-        if self.is_connected():
-            yield from self.adapter.disconnect()
-            self.next_id = -1
+        async with self.conn_lock:
+            if self.is_connected():
+                await self.adapter.disconnect()
+                self.next_id = -1
+
+    @classmethod
+    def dedicated_loop(cls):
+        """Return the shared background event loop used for synchronous
+        callers, starting its thread on first use.
+
+        """
+        global SYNC_LOOP, SYNC_LOOP_THREAD
+        with SYNC_LOOP_LOCK:
+            if SYNC_LOOP is None:
+                SYNC_LOOP = asyncio.new_event_loop()
+                SYNC_LOOP_THREAD = threading.Thread(
+                    target=SYNC_LOOP.run_forever, name='ibclientpy-loop',
+                    daemon=True)
+                SYNC_LOOP_THREAD.start()
+        return SYNC_LOOP
+
+    @classmethod
+    def sync_client(cls):
+        """Return a new Client bound to the shared background event loop.
+        Clients intended for use through run_sync() must be created this
+        way so the adapter's connection runs on the same loop the
+        coroutines are submitted to.
+
+        """
+        return cls(cls.dedicated_loop())
+
+    def run_sync(self, coro):
+        """Run the specified coroutine on the shared background event loop
+        and return its result. This lets synchronous code drive the client
+        without creating a new event loop (and reconnecting to TWS) per
+        call.
 
-    @asyncio.coroutine
-    def get_next_valid_id(self):
+        The client must have been created via sync_client() -- a client
+        bound to any other loop would have its connection living on one
+        loop while the coroutine runs on another, so that case raises a
+        RuntimeError. Calling from the background loop's own thread also
+        raises -- the coroutine could never run while its caller blocks
+        the loop.
+
+        Keyword arguments:
+        coro -- coroutine to run
+
+        """
+        loop = Client.dedicated_loop()
+        if self.loop is not loop:
+            raise RuntimeError('run_sync() requires a client bound to the '
+                               'dedicated loop; create it with '
+                               'Client.sync_client()')
+        if threading.current_thread() is SYNC_LOOP_THREAD:
+            raise RuntimeError('run_sync() called from the loop thread; '
+                               'await the coroutine instead')
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def get_next_valid_id(self):
         """Return the next valid request ID that can be used for orders."""
-        future = yield from self.adapter.req_ids(1)
-        yield from future
-        return future.result()
+        future = await self.adapter.req_ids(1)
+        return await future
 
     def is_connected(self):
         """Return True if the Client is connected; False, otherwise."""
@@ -87,57 +192,102 @@ class Client:
     # Accounts
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_account_name(self):
+    async def get_account_name(self):
         """Return the account name associated with this session as a string.
 
         """
-        future = yield from self.adapter.req_managed_accts()
-        yield from future
-        return future.result()
+        future = await self.adapter.req_managed_accts()
+        return await future
 
-    @asyncio.coroutine
-    def get_account(self):
+    async def get_account(self):
         """Return the ibapipy.data.account.Account instance associated with
         this session.
 
         """
-        account_name = yield from self.get_account_name()
+        account_name = await self.get_account_name()
         accounts_list = [x.strip() for x in account_name.split(',')]
         if len(accounts_list) > 1:
             futureresults = []
             for account in accounts_list:
                 if account is not "" and account.startswith('f'):
-                    future = yield from self.adapter.req_account_updates(account)
-                    yield from future
-                    futureresults.append(future.result())
+                    future = await self.adapter.req_account_updates(account)
+                    futureresults.append(await future)
             return futureresults
         else:
-            future = yield from self.adapter.req_account_updates(account_name)
-            yield from future
-            return future.result()
+            future = await self.adapter.req_account_updates(account_name)
+            return await future
 
     # *************************************************************************
     # Contracts
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_contract(self, contract):
+    async def get_contract(self, contract):
         """Return a fully populated ibapipy.data.contract.Contract instance
         from the specified Contract. The specified contract should have the
         'sec_type', 'symbol', 'currency', and 'exchange' attributes populated.
 
+        Results are cached so that repeated requests for the same basic
+        contract do not pay a round trip to TWS. Cached entries expire after
+        config.CONTRACT_CACHE_TTL seconds.
+
         Keyword arguments:
         contract -- ibapipy.data.contract.Contract instance
 
         """
-        req_id = self.next_id
-        self.next_id += 1
-        basic_contract = get_basic_contract(contract)
-        future = yield from self.adapter.req_contract_details(req_id,
-                                                              basic_contract)
-        yield from future
-        return future.result()
+        key = (contract.sec_type, contract.symbol, contract.currency,
+               contract.exchange)
+        entry = self.contract_cache.get(key)
+        if entry is not None:
+            timestamp, cached = entry
+            if time.monotonic() - timestamp < config.CONTRACT_CACHE_TTL:
+                self.contract_cache.move_to_end(key)
+                return cached
+            del self.contract_cache[key]
+        # Coalesce duplicate concurrent requests for the same contract
+        pending = self.contract_inflight.get(key)
+        if pending is not None:
+            return await pending
+        inflight = asyncio.Future()
+        self.contract_inflight[key] = inflight
+        req_id = next(self.id_iter)
+        basic_contract = ibhd.get_basic_contract(contract)
+        try:
+            future = await self.adapter.req_contract_details(req_id,
+                                                             basic_contract)
+            result = await future
+            self.contract_cache[key] = (time.monotonic(), result)
+            if len(self.contract_cache) > config.CONTRACT_CACHE_SIZE:
+                self.contract_cache.popitem(last=False)
+            inflight.set_result(result)
+            return result
+        except Exception as error:
+            inflight.set_exception(error)
+            # Retrieve the exception immediately: coalesced waiters still
+            # receive it when they await the future, but a solo call no
+            # longer logs "Future exception was never retrieved" at GC
+            # time
+            inflight.exception()
+            raise
+        finally:
+            del self.contract_inflight[key]
+            # Cancellation is a BaseException and bypasses the clause
+            # above; resolve the future on this path too or coalesced
+            # waiters would hang forever
+            if not inflight.done():
+                inflight.cancel()
+
+    def invalidate_contract(self, contract):
+        """Remove the specified contract from the cache so that the next
+        get_contract() call performs a full round trip (e.g. after a
+        corporate action).
+
+        Keyword arguments:
+        contract -- ibapipy.data.contract.Contract instance
+
+        """
+        key = (contract.sec_type, contract.symbol, contract.currency,
+               contract.exchange)
+        self.contract_cache.pop(key, None)
 
     # *************************************************************************
     # Errors
@@ -154,8 +304,7 @@ class Client:
         message -- error message
 
         """
-        LOG.info('Client error/message: {0}; {1}; {2}'.format(req_id, code,
-                                                              message))
+        LOG.info('Client error/message: %s; %s; %s', req_id, code, message)
 
     # *************************************************************************
     # Holdings
@@ -177,8 +326,7 @@ class Client:
     # Orders
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_orders(self):
+    async def get_orders(self):
         """Return a tuple of ibapipy.data.order.Order instances with additional
         attributes on each order. Each order has a 'contract' field and
         'executions' field added to it where the contract is the underlying
@@ -186,18 +334,16 @@ class Client:
         associated with the order.
 
         """
-        self.adapter.executions_fut = Future()
-        self.adapter.orders_fut = Future()
-        req_id = self.next_id
-        self.next_id += 1
-        yield from self.adapter.req_executions(req_id, ibef.ExecutionFilter())
-        yield from self.adapter.req_all_open_orders()
-        yield from self.adapter.executions_fut
-        yield from self.adapter.orders_fut
-        return self.adapter.orders_fut.result()
-
-    @asyncio.coroutine
-    def place_order(self, contract, order, profit_offset=0, loss_offset=0):
+        async with self.orders_lock:
+            req_id = next(self.id_iter)
+            executions_future = await self.adapter.req_executions(
+                req_id, EMPTY_EXEC_FILTER)
+            orders_future = await self.adapter.req_all_open_orders()
+            await asyncio.gather(executions_future, orders_future)
+            return orders_future.result()
+
+    async def place_order(self, contract, order, profit_offset=0,
+                          loss_offset=0):
         """Place an order for the specified contract. If profit offset or loss
         offset is non-zero, a corresponding order will be placed after the
         parent order has been filled.
@@ -217,32 +363,37 @@ class Client:
                          (default: 0)
 
         """
-        req_id = self.next_id
-        self.next_id += 1
+        req_id = next(self.id_iter)
         self.id_contracts[req_id] = contract
         order.order_id = req_id
-        self.order_handler.add_order(order, profit_offset, loss_offset)
-        yield from self.adapter.place_order(req_id, contract, order)
+        self.order_handler.add_order(order, contract, profit_offset,
+                                     loss_offset)
+        try:
+            await self.adapter.place_order(req_id, contract, order)
+        except Exception:
+            # Roll back the bookkeeping so a failed submission does not
+            # leave orphaned entries behind
+            self.id_contracts.pop(req_id, None)
+            self.order_handler.orders.pop(req_id, None)
+            self.order_handler.brackets.pop(req_id, None)
+            raise
         return req_id
 
-    @asyncio.coroutine
-    def cancel_order(self, req_id):
+    async def cancel_order(self, req_id):
         """Cancel the order associated with the specified request ID.
 
         Keyword arguments:
         req_id -- request ID
 
         """
-        self.adapter.order_cancel_fut = Future()
-        yield from self.adapter.cancel_order(req_id)
-        yield from self.adapter.order_cancel_fut
+        future = await self.adapter.cancel_order(req_id)
+        await future
 
     # *************************************************************************
     # Pricing
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_next_history_block(self, contract, start, end, timezone):
+    async def get_next_history_block(self, contract, start, end, timezone):
         """Return the next available block of historical ticks for the
         specified contract and time period. The result will be of the form
         (int, tuple) where "int" is the number of blocks remaining to be filled
@@ -262,41 +413,95 @@ class Client:
         timezone   -- timezone in 'Country/Region' format
 
         """
-        # Grab from the queue if we have data waiting
-        if self.adapter.history_queue.qsize() > 0:
-            ticks = yield from self.adapter.history_queue.get()
-            return len(self.history_pending), ticks
-        # Build the initial request if needed
-        if len(self.history_pending) == 0:
+        queue = self.adapter.history_queue
+        # Build the initial request and start the submission pipeline if
+        # needed
+        if self.history_remaining == 0 and queue.qsize() == 0:
             blocks = ibhd.get_parameters(contract, start, end, timezone)
             self.history_pending.extend(blocks)
-        # Retrieve the history for the next set of parameters
-        parms = self.history_pending.pop(0)
-        yield from asyncio.sleep(parms['delay'])
-        req_id = self.next_id
-        self.next_id += 1
-        self.id_contracts[req_id] = parms['contract']
-        yield from self.adapter.req_historical_data(
-            req_id, get_basic_contract(parms['contract']),
-            parms['end_date_time'], parms['duration_str'],
-            parms['bar_size_setting'], parms['what_to_show'],
-            parms['use_rth'], parms['format_date'])
-        ticks = yield from self.adapter.history_queue.get()
-        # Check if we're done with the overall request
-        if len(self.history_pending) == 0:
-            yield from self.adapter.history_queue.put(None)
-        return len(self.history_pending), ticks
-
-    @asyncio.coroutine
-    def cancel_history(self):
+            self.history_remaining = len(blocks)
+            self.history_sem = asyncio.Semaphore(
+                config.MAX_CONCURRENT_HISTORY)
+            self.history_task = asyncio.ensure_future(
+                self.__submit_history__())
+        # Blocks complete in any order; buffer them by request ID and only
+        # hand out the oldest outstanding request so ticks stay
+        # chronological
+        while True:
+            if len(self.history_order) > 0 and \
+                    self.history_order[0] in self.history_done:
+                ticks = self.history_done.pop(self.history_order.popleft())
+                break
+            # Fast path: skip a task switch when a block is already waiting
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                item = await queue.get()
+            if item is None:
+                # A stale terminator from an earlier cancel_history() is
+                # ignored while a download is active
+                if self.history_remaining == 0:
+                    ticks = None
+                    break
+                continue
+            req_id, block = item
+            # Blocks from requests cancelled mid-flight are dropped
+            if req_id in self.history_order:
+                self.history_done[req_id] = block
+        if ticks is not None and self.history_remaining > 0:
+            self.history_remaining -= 1
+            # Let the pipeline submit the next block
+            self.history_sem.release()
+            # Check if we're done with the overall request
+            if self.history_remaining == 0:
+                await queue.put(None)
+        return self.history_remaining, ticks
+
+    async def __submit_history__(self):
+        """Submit the queued historical data requests, keeping up to
+        config.MAX_CONCURRENT_HISTORY requests in flight. The pacing delay
+        separates submissions, but round trips overlap so we are not paying
+        one full round trip per block.
+
+        """
+        while len(self.history_pending) > 0:
+            parms = self.history_pending.popleft()
+            await self.history_sem.acquire()
+            await asyncio.sleep(parms['delay'])
+            req_id = next(self.id_iter)
+            self.id_contracts[req_id] = parms['contract']
+            self.history_order.append(req_id)
+            await self.adapter.req_historical_data(
+                req_id, ibhd.get_basic_contract(parms['contract']),
+                parms['end_date_time'], parms['duration_str'],
+                parms['bar_size_setting'], parms['what_to_show'],
+                parms['use_rth'], parms['format_date'])
+
+    async def cancel_history(self):
         """Stop receiving ticks from the get_next_history_block() method."""
+        if self.history_task is not None:
+            self.history_task.cancel()
+            self.history_task = None
         self.history_pending.clear()
-        while self.adapter.history_queue.qsize() > 0:
-            yield from self.adapter.history_queue.get()
-        yield from self.adapter.history_queue.put(None)
-
-    @asyncio.coroutine
-    def get_next_tick(self, contract):
+        self.history_remaining = 0
+        self.history_order.clear()
+        self.history_done.clear()
+        # Invalidate requests still in flight at TWS; their remaining
+        # callbacks are dropped by the adapter once the entries are gone
+        for req_id in self.adapter.history_bars:
+            self.id_contracts.pop(req_id, None)
+        self.adapter.history_bars.clear()
+        self.adapter.history_symbols.clear()
+        # Drain without a coroutine round trip per queued block
+        queue = self.adapter.history_queue
+        try:
+            while True:
+                queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        await queue.put(None)
+
+    async def get_next_tick(self, contract):
         """Return the next available realtime tick for the specified contract.
         If no more ticks are available (e.g. cancel_ticks() has been called),
         None will be returned.
@@ -305,45 +510,43 @@ class Client:
         contract -- ibapipy.data.contract.Contract instance
 
         """
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
+        key = ibca.get_key(contract)
         # Get the request ID for the active market data stream
-        if key in self.adapter.market_data_ids:
-            req_id = self.adapter.market_data_ids[key]
+        req_id = self.adapter.market_data_ids.get(key)
         # Create a new market data request
-        else:
-            req_id = self.next_id
-            self.next_id += 1
+        if req_id is None:
+            req_id = next(self.id_iter)
             self.id_contracts[req_id] = contract
-            yield from self.adapter.req_mkt_data(req_id, contract)
-        # Pull from the queue
-        tick = yield from self.adapter.tick_queue[req_id].get()
-        # If the tick is None, we're done so remove the old request ID
+            await self.adapter.req_mkt_data(req_id, contract)
+        # Pull from the queue; skip a task switch when the adapter has
+        # already produced a tick
+        queue = self.adapter.tick_queue[req_id]
+        try:
+            tick = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            tick = await queue.get()
+        # If the tick is None, we're done so remove the old request ID and
+        # its per-stream state
         if tick is None:
             self.adapter.market_data_ids.pop(key)
+            self.adapter.tick_queue.pop(req_id, None)
+            self.adapter.tick.pop(req_id, None)
+            self.id_contracts.pop(req_id, None)
         return tick
 
-    @asyncio.coroutine
-    def cancel_ticks(self, contract):
+    async def cancel_ticks(self, contract):
         """Stop receiving ticks from the get_next_tick() method."""
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
-        if key in self.adapter.market_data_ids:
-            req_id = self.adapter.market_data_ids[key]
-            yield from self.adapter.cancel_mkt_data(req_id)
-            yield from self.adapter.tick_queue[req_id].put(None)
-
-
-def get_basic_contract(contract):
-    """TWS is complaining if we provide a fully populated contract. Here we
-    we strip away everything but the core attributes.
-
-    Keyword arguments:
-    contract -- ibapipy.data.contract.Contract object
-
-    """
-    result = ibc.Contract()
-    result.sec_type = contract.sec_type
-    result.symbol = contract.symbol
-    result.currency = contract.currency
-    result.exchange = contract.exchange
-    return result
+        key = ibca.get_key(contract)
+        req_id = self.adapter.market_data_ids.get(key)
+        if req_id is not None:
+            await self.adapter.cancel_mkt_data(req_id)
+            # Drain any stale ticks so the terminating None cannot block on
+            # a full queue
+            queue = self.adapter.tick_queue[req_id]
+            try:
+                while True:
+                    queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            queue.put_nowait(None)
 
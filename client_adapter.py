@@ -7,11 +7,64 @@ from ibapipy.data.account import Account
 from ibapipy.data.holding import Holding
 from ibapipy.data.tick import Tick
 import asyncio
+import math
 import time
 import ibapipy.client_socket as ibcs
+import ibclientpy.config as config
 import ibclientpy.date_support as ds
 
 
+def __set_tick_bid__(tick, price, now):
+    tick.milliseconds = now
+    tick.bid = price
+
+
+def __set_tick_ask__(tick, price, now):
+    tick.milliseconds = now
+    tick.ask = price
+
+
+def __set_tick_bid_size__(tick, size, now):
+    tick.milliseconds = now
+    tick.bid_size = size
+
+
+def __set_tick_ask_size__(tick, size, now):
+    tick.milliseconds = now
+    tick.ask_size = size
+
+
+def __set_tick_volume__(tick, size, now):
+    tick.milliseconds = now
+    tick.volume = size
+
+
+# Field setters by TWS tick type; one hash lookup replaces the compare
+# chains in tick_price/tick_size, and unhandled types fall through
+PRICE_HANDLERS = {1: __set_tick_bid__, 2: __set_tick_ask__}
+SIZE_HANDLERS = {0: __set_tick_bid_size__, 3: __set_tick_ask_size__,
+                 8: __set_tick_volume__}
+
+# Account attribute names by the TWS key reported in update_account_value;
+# a single hash lookup replaces a linear string-compare cascade
+ACCOUNT_ATTRS = {'netliquidation': 'net_liquidation',
+                 'previousdayequitywithloanvalue': 'previous_equity',
+                 'equitywithloanvalue': 'equity',
+                 'totalcashvalue': 'cash',
+                 'initmarginreq': 'initial_margin',
+                 'maintmarginreq': 'maintenance_margin',
+                 'availablefunds': 'available_funds',
+                 'excessliquidity': 'excess_liquidity',
+                 'sma': 'sma',
+                 'buyingpower': 'buying_power'}
+
+# Bit assigned to each account key; received keys are OR'd into a mask so
+# the have-we-seen-everything test is one integer compare instead of
+# checking every attribute for None
+ACCOUNT_BITS = {key: 1 << index for index, key in enumerate(ACCOUNT_ATTRS)}
+ACCOUNT_ALL_BITS = (1 << len(ACCOUNT_ATTRS)) - 1
+
+
 class ClientAdapter(ibcs.ClientSocket):
     """Adapts methods from a ClientSocket."""
 
@@ -29,36 +82,62 @@ class ClientAdapter(ibcs.ClientSocket):
         self.account_fut = Future()
         self.account_name_fut = Future()
         # Contracts
-        # Contract asyncio.Futures by 'symbol.currency' key
+        # Contract asyncio.Futures by request ID
         self.contract_futs = {}
         # Order call tracking -- see order_status() comments for details
         self.open_order_end_called = False
         self.open_order_ids = {}
-        # Historical ticks
-        self.history_pending = []
-        self.history_queue = Queue()
-        # Realtime ticks
+        # Number of False entries in open_order_ids, maintained so the
+        # are-we-done test is O(1) instead of scanning the values
+        self.open_orders_pending = 0
+        # Historical ticks being accumulated, by request ID
+        self.history_bars = {}
+        # Local symbol for each in-flight history request, resolved once
+        # instead of via a contract lookup per bar
+        self.history_symbols = {}
+        self.history_queue = Queue(maxsize=config.HISTORY_QUEUE_MAX)
+        # Last realtime tick by request ID. The request ID uniquely
+        # identifies the market data stream, so keying by it avoids a
+        # contract lookup and string key per incoming tick.
         self.tick = {}
-        # Market data (tick) requests {'symbol.currency' : req_id, ...}
+        # Market data (tick) requests {(symbol, currency) : req_id, ...}
         self.market_data_ids = {}
         # Incoming tick queue {req_id : Queue(), ...}
         self.tick_queue = {}
+        # ACCOUNT_BITS seen since the last req_account_updates
+        self.account_mask = 0
+        # Timestamp shared by callbacks that fire within one event-loop
+        # iteration; see __now__()
+        self.now_cached = None
         # Futures
         self.executions_fut = None
         self.orders_fut = None
-        self.order_cancel_fut = None
+        # Order cancellation futures by request ID
+        self.order_cancel_futs = {}
 
     # *************************************************************************
     # Outgoing Requests
     # *************************************************************************
 
-    @asyncio.coroutine
-    def cancel_mkt_data(self, req_id):
-        yield from ibcs.ClientSocket.cancel_mkt_data(self, req_id)
+    async def connect(self, host, port, client_id):
+        # TWS sends an unsolicited next_valid_id immediately after the
+        # handshake; arm the future ahead of time so the client can consume
+        # it without a req_ids round trip.
+        self.next_valid_id_fut = Future()
+        await ibcs.ClientSocket.connect(self, host, port, client_id)
+        return self.next_valid_id_fut
+
+    async def cancel_mkt_data(self, req_id):
+        await ibcs.ClientSocket.cancel_mkt_data(self, req_id)
 
-    @asyncio.coroutine
-    def req_account_updates(self, acct_code):
+    async def cancel_order(self, req_id):
+        self.order_cancel_futs[req_id] = Future()
+        await ibcs.ClientSocket.cancel_order(self, req_id)
+        return self.order_cancel_futs[req_id]
+
+    async def req_account_updates(self, acct_code):
         self.account_fut = Future()
+        self.account_mask = 0
         self.account.account_name = None
         self.account.milliseconds = 0
         self.account.net_liquidation = None
@@ -71,120 +150,138 @@ class ClientAdapter(ibcs.ClientSocket):
         self.account.excess_liquidity = None
         self.account.sma = None
         self.account.buying_power = None
-        yield from ibcs.ClientSocket.req_account_updates(self, True,
-                                                         acct_code)
+        await ibcs.ClientSocket.req_account_updates(self, True, acct_code)
         return self.account_fut
 
-    @asyncio.coroutine
-    def req_all_open_orders(self):
+    async def req_all_open_orders(self):
+        self.orders_fut = Future()
         self.open_order_end_called = False
         self.open_order_ids.clear()
-        yield from ibcs.ClientSocket.req_all_open_orders(self)
-
-    @asyncio.coroutine
-    def req_contract_details(self, req_id, contract):
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
-        self.contract_futs[key] = Future()
-        yield from ibcs.ClientSocket.req_contract_details(self, req_id,
-                                                          contract)
-        return self.contract_futs[key]
-
-    @asyncio.coroutine
-    def req_executions(self, req_id, exec_filter):
-        yield from ibcs.ClientSocket.req_executions(self, req_id, exec_filter)
-
-    @asyncio.coroutine
-    def req_historical_data(self, req_id, contract, end_date_time,
-                            duration_str, bar_size_setting, what_to_show,
-                            use_rth, format_date):
-        self.history_pending.clear()
-        yield from ibcs.ClientSocket.req_historical_data(
+        self.open_orders_pending = 0
+        await ibcs.ClientSocket.req_all_open_orders(self)
+        return self.orders_fut
+
+    async def req_contract_details(self, req_id, contract):
+        fut = Future()
+        self.contract_futs[req_id] = fut
+        await ibcs.ClientSocket.req_contract_details(self, req_id,
+                                                     contract)
+        return fut
+
+    async def req_executions(self, req_id, exec_filter):
+        self.executions_fut = Future()
+        await ibcs.ClientSocket.req_executions(self, req_id, exec_filter)
+        return self.executions_fut
+
+    async def req_historical_data(self, req_id, contract, end_date_time,
+                                  duration_str, bar_size_setting,
+                                  what_to_show, use_rth, format_date):
+        self.history_bars[req_id] = []
+        await ibcs.ClientSocket.req_historical_data(
             self, req_id, contract, end_date_time, duration_str,
             bar_size_setting, what_to_show, use_rth, format_date)
 
-    @asyncio.coroutine
-    def req_ids(self, num_ids):
+    async def req_ids(self, num_ids):
         self.next_valid_id_fut = Future()
-        yield from ibcs.ClientSocket.req_ids(self, num_ids)
+        await ibcs.ClientSocket.req_ids(self, num_ids)
         return self.next_valid_id_fut
 
-    @asyncio.coroutine
-    def req_managed_accts(self):
+    async def req_managed_accts(self):
         self.account_name_fut = Future()
-        yield from ibcs.ClientSocket.req_managed_accts(self)
+        await ibcs.ClientSocket.req_managed_accts(self)
         return self.account_name_fut
 
-    @asyncio.coroutine
-    def req_mkt_data(self, req_id, contract, generic_ticklist='',
-                     snapshot=False):
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
+    async def req_mkt_data(self, req_id, contract, generic_ticklist='',
+                           snapshot=False):
+        key = get_key(contract)
         self.market_data_ids[key] = req_id
-        self.tick_queue[req_id] = Queue()
-        yield from ibcs.ClientSocket.req_mkt_data(self, req_id, contract,
-                                                  generic_ticklist, snapshot)
+        self.tick_queue[req_id] = Queue(maxsize=config.TICK_QUEUE_MAX)
+        await ibcs.ClientSocket.req_mkt_data(self, req_id, contract,
+                                             generic_ticklist, snapshot)
 
     # *************************************************************************
     # Incoming Data
     # *************************************************************************
 
-    @asyncio.coroutine
-    def account_download_end(self, account_name):
+    def __now__(self):
+        """Return the current time in milliseconds since the Epoch, cached
+        for the duration of the current event-loop iteration. The socket
+        reader typically drains many wire messages before yielding, so one
+        clock read serves the whole batch; the cache is invalidated via
+        call_soon once the loop comes back around.
+
+        """
+        now = self.now_cached
+        if now is None:
+            now = ds.now()
+            self.now_cached = now
+            asyncio.get_running_loop().call_soon(self.__clear_now_cache__)
+        return now
+
+    def __clear_now_cache__(self):
+        """Invalidate the timestamp cached by __now__()."""
+        self.now_cached = None
+
+    async def account_download_end(self, account_name):
         pass
 
-    @asyncio.coroutine
-    def contract_details(self, req_id, contract):
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
-        if is_future_valid(self.contract_futs[key]):
-            self.contract_futs[key].set_result(contract)
+    async def contract_details(self, req_id, contract):
+        fut = self.contract_futs.get(req_id)
+        if fut is not None and not fut.done():
+            fut.set_result(contract)
 
-    @asyncio.coroutine
-    def contract_details_end(self, req_id):
-        pass
+    async def contract_details_end(self, req_id):
+        self.contract_futs.pop(req_id, None)
 
-    @asyncio.coroutine
-    def error(self, req_id, code, message):
+    async def error(self, req_id, code, message):
         self.client.on_error(req_id, code, message)
 
-    @asyncio.coroutine
-    def exec_details(self, req_id, contract, execution):
+    async def exec_details(self, req_id, contract, execution):
         self.client.order_handler.add_execution(execution)
 
-    @asyncio.coroutine
-    def exec_details_end(self, req_id):
+    async def exec_details_end(self, req_id):
         fut = self.executions_fut
         if fut is not None and not fut.done():
             fut.set_result(True)
 
-    @asyncio.coroutine
-    def historical_data(self, req_id, date, open, high, low, close, volume,
-                        bar_count, wap, has_gaps):
-        contract = self.client.id_contracts[req_id]
-        # Download is complete
+    async def historical_data(self, req_id, date, open, high, low, close,
+                              volume, bar_count, wap, has_gaps):
+        # Ignore requests invalidated by cancel_history(); TWS may keep
+        # streaming them until the cancellation takes effect
+        bars = self.history_bars.get(req_id)
+        if bars is None:
+            return
+        # Download is complete; deliver the block tagged with its request
+        # ID so the client can restore submission order
         if 'finished' in date:
-            yield from self.history_queue.put(tuple(self.history_pending))
-            self.history_pending.clear()
+            await self.history_queue.put((req_id, tuple(bars)))
+            del self.history_bars[req_id]
+            self.history_symbols.pop(req_id, None)
+            # The request is one-shot; drop its contract association so
+            # id_contracts stays proportional to active requests
+            self.client.id_contracts.pop(req_id, None)
         # Still receiving bars from the request
         else:
-            milliseconds = int(date) * 1000
-            tick = Tick(contract.local_symbol, milliseconds)
+            local_symbol = self.history_symbols.get(req_id)
+            if local_symbol is None:
+                local_symbol = self.client.id_contracts[req_id].local_symbol
+                self.history_symbols[req_id] = local_symbol
+            tick = Tick(local_symbol, int(date) * 1000)
             tick.bid = low
             tick.ask = high
             tick.volume = volume * 100
-            self.history_pending.append(tick)
+            bars.append(tick)
 
-    @asyncio.coroutine
-    def managed_accounts(self, account_number):
+    async def managed_accounts(self, account_number):
         if is_future_valid(self.account_name_fut):
             self.account_name_fut.set_result(account_number)
 
-    @asyncio.coroutine
-    def next_valid_id(self, req_id):
+    async def next_valid_id(self, req_id):
         fut = self.next_valid_id_fut
         if fut is not None and not fut.done():
             fut.set_result(req_id)
 
-    @asyncio.coroutine
-    def open_order(self, req_id, contract, order):
+    async def open_order(self, req_id, contract, order):
         self.client.order_handler.update_order(req_id, contract, order)
         # Update our "open order tracking" dictionary. Being in the dictionary
         # means that open_order has been called or order_status has been called
@@ -193,14 +290,14 @@ class ClientAdapter(ibcs.ClientSocket):
         # the order_status() comments for details.
         if req_id not in self.open_order_ids:
             self.open_order_ids[req_id] = False
+            self.open_orders_pending += 1
 
-    @asyncio.coroutine
-    def open_order_end(self):
+    async def open_order_end(self):
         self.open_order_end_called = True
 
-    @asyncio.coroutine
-    def order_status(self, req_id, status, filled, remaining, avg_fill_price,
-                     perm_id, parent_id, last_fill_price, client_id, why_held):
+    async def order_status(self, req_id, status, filled, remaining,
+                           avg_fill_price, perm_id, parent_id,
+                           last_fill_price, client_id, why_held):
         """Called when the order status is updated.
 
         The IB API appears to work like this:
@@ -216,8 +313,15 @@ class ClientAdapter(ibcs.ClientSocket):
         request id.
 
         """
-        # Track which order order_status has been called on
-        self.open_order_ids[req_id] = status != 'apipending'
+        # Track which order order_status has been called on, keeping the
+        # count of still-pending entries in step
+        done = status != 'apipending'
+        previous = self.open_order_ids.get(req_id)
+        self.open_order_ids[req_id] = done
+        if previous is not False and not done:
+            self.open_orders_pending += 1
+        elif previous is False and done:
+            self.open_orders_pending -= 1
         if req_id not in self.client.order_handler.orders:
             return
         order = self.client.order_handler.orders[req_id]
@@ -233,55 +337,73 @@ class ClientAdapter(ibcs.ClientSocket):
         order.why_held = why_held
         # Update any bracketed orders for this order
         if order.status == 'filled':
-            self.client.order_handler.update_brackets(order)
+            await self.client.order_handler.update_brackets(order)
         # See if we should set a result on the order cancelled future
-        fut = self.order_cancel_fut
-        if status == 'cancelled' and fut is not None and not fut.done():
-            fut.set_result(req_id)
+        if status == 'cancelled':
+            fut = self.order_cancel_futs.pop(req_id, None)
+            if fut is not None and not fut.done():
+                fut.set_result(req_id)
+        # Terminal orders no longer need their contract association or
+        # bracket bookkeeping. Bracket state with live children is kept:
+        # the OCA relation is still consulted when a child fills.
+        if status in ('filled', 'cancelled'):
+            self.client.id_contracts.pop(req_id, None)
+            brackets = self.client.order_handler.brackets
+            state = brackets.get(req_id)
+            if state is not None and state.profit_id < 0 and \
+                    state.loss_id < 0:
+                del brackets[req_id]
         # See if we should return a result on the orders future
         fut = self.orders_fut
-        if False not in self.open_order_ids.values() and fut is not None and \
+        if self.open_orders_pending == 0 and fut is not None and \
                 self.open_order_end_called and not fut.done():
             fut.set_result(tuple(self.client.order_handler.orders.values()))
 
-    @asyncio.coroutine
-    def tick_price(self, req_id, tick_type, price, can_auto_execute):
-        local_symbol = self.client.id_contracts[req_id].local_symbol
-        if local_symbol not in self.tick:
-            self.tick[local_symbol] = Tick(local_symbol, ds.now())
+    async def tick_price(self, req_id, tick_type, price, can_auto_execute):
+        tick = self.tick.get(req_id)
+        if tick is None:
+            # Ignore stragglers that were already on the wire when the
+            # stream was cancelled and its state released
+            contract = self.client.id_contracts.get(req_id)
+            if contract is None:
+                return
+            tick = Tick(contract.local_symbol, self.__now__())
+            self.tick[req_id] = tick
         # Update the last tick
-        tick = self.tick[local_symbol]
         tick.volume = 0
-        if tick_type == 1:
-            tick.milliseconds = ds.now()
-            tick.bid = price
-        elif tick_type == 2:
-            tick.milliseconds = ds.now()
-            tick.ask = price
+        handler = PRICE_HANDLERS.get(tick_type)
+        if handler is not None:
+            handler(tick, price, self.__now__())
         # We can get ask prices lower than bid prices; don't return those.
         if tick.bid > 0 and tick.ask > tick.bid:
-            yield from self.tick_queue[req_id].put(copy_tick(tick))
-
-    @asyncio.coroutine
-    def tick_size(self, req_id, tick_type, size):
-        local_symbol = self.client.id_contracts[req_id].local_symbol
-        if local_symbol not in self.tick:
-            self.tick[local_symbol] = Tick(local_symbol, ds.now())
+            queue = self.tick_queue.get(req_id)
+            if queue is None:
+                return
+            # put_nowait avoids suspending the coroutine once per incoming
+            # tick; when the queue is full, block and apply backpressure to
+            # the socket reader instead of growing without bound.
+            try:
+                queue.put_nowait(copy_tick(tick))
+            except asyncio.QueueFull:
+                await queue.put(copy_tick(tick))
+
+    async def tick_size(self, req_id, tick_type, size):
+        tick = self.tick.get(req_id)
+        if tick is None:
+            # Ignore stragglers that were already on the wire when the
+            # stream was cancelled and its state released
+            contract = self.client.id_contracts.get(req_id)
+            if contract is None:
+                return
+            tick = Tick(contract.local_symbol, self.__now__())
+            self.tick[req_id] = tick
         # Update the last tick
-        tick = self.tick[local_symbol]
         tick.volume = 0
-        if tick_type == 0:
-            tick.milliseconds = ds.now()
-            tick.bid_size = size
-        elif tick_type == 3:
-            tick.milliseconds = ds.now()
-            tick.ask_size = size
-        elif tick_type == 8:
-            tick.milliseconds = ds.now()
-            tick.volume = size
-
-    @asyncio.coroutine
-    def update_account_time(self, timestamp):
+        handler = SIZE_HANDLERS.get(tick_type)
+        if handler is not None:
+            handler(tick, size, self.__now__())
+
+    async def update_account_time(self, timestamp):
         """Called when the account time is updated. The 'timestamp' is in the
         form of hh:mm and does not include a day. This converts the time into
         milliseconds (using the current day and UTC timezone) before updating
@@ -291,67 +413,48 @@ class ClientAdapter(ibcs.ClientSocket):
         timestamp -- last update time for account data
 
         """
-        partial_date = ds.ms_to_str(time.time() * 1000, 'UTC', '%Y-%m-%d')
+        partial_date = time.strftime('%Y-%m-%d', time.gmtime())
         full_date = '{0} {1}'.format(partial_date, timestamp)
         self.account.milliseconds = ds.str_to_ms(full_date, 'UTC',
                                                  '%Y-%m-%d %H:%M')
 
-    @asyncio.coroutine
-    def update_account_value(self, key, value, currency, account_name):
-        self.account.account_name = account_name
-        self.account.milliseconds = int(time.time() * 1000)
-        if key == 'netliquidation':
-            self.account.net_liquidation = float(value)
-        elif key == 'previousdayequitywithloanvalue':
-            self.account.previous_equity = float(value)
-        elif key == 'equitywithloanvalue':
-            self.account.equity = float(value)
-        elif key == 'totalcashvalue':
-            self.account.cash = float(value)
-        elif key == 'initmarginreq':
-            self.account.initial_margin = float(value)
-        elif key == 'maintmarginreq':
-            self.account.maintenance_margin = float(value)
-        elif key == 'availablefunds':
-            self.account.available_funds = float(value)
-        elif key == 'excessliquidity':
-            self.account.excess_liquidity = float(value)
-        elif key == 'sma':
-            self.account.sma = float(value)
-        elif key == 'buyingpower':
-            self.account.buying_power = float(value)
+    async def update_account_value(self, key, value, currency, account_name):
+        # Bind the account locally; this method runs once per attribute per
+        # update cycle and otherwise re-resolves self.account dozens of
+        # times
+        account = self.account
+        account.account_name = account_name
+        account.milliseconds = time.time_ns() // 1000000
+        attr = ACCOUNT_ATTRS.get(key)
+        if attr is not None:
+            setattr(account, attr, float(value))
+            self.account_mask |= ACCOUNT_BITS[key]
         # It can take IB a long time to call account_download_end, so we check
         # to see if we have all the data we need and, if so, consider the
-        # request completed.
-        if self.account.account_name is not None and \
-                self.account.milliseconds > 0 and \
-                self.account.net_liquidation is not None and \
-                self.account.previous_equity is not None and \
-                self.account.equity is not None and \
-                self.account.cash is not None and \
-                self.account.initial_margin is not None and \
-                self.account.maintenance_margin is not None and \
-                self.account.available_funds is not None and \
-                self.account.excess_liquidity is not None and \
-                self.account.sma is not None and \
-                self.account.buying_power is not None and \
+        # request completed. The name and timestamp are set unconditionally
+        # above, so the mask alone decides completeness.
+        if self.account_mask == ACCOUNT_ALL_BITS and \
                 is_future_valid(self.account_fut):
-            yield from ibcs.ClientSocket.req_account_updates(self, False,
-                                                             account_name)
-            self.account_fut.set_result(self.account)
-
-    @asyncio.coroutine
-    def update_portfolio(self, contract, position, market_price, market_value,
-                         average_cost, unrealized_pnl, realized_pnl,
-                         account_name):
+            await ibcs.ClientSocket.req_account_updates(self, False,
+                                                        account_name)
+            self.account_fut.set_result(account)
+
+    async def update_portfolio(self, contract, position, market_price,
+                               market_value, average_cost, unrealized_pnl,
+                               realized_pnl, account_name):
         # Sometimes when closing out a position, IB gets confused and will
-        # report the P&L as 1.79769313486232e+308.
-        if abs(unrealized_pnl) > 1000000000000:
+        # report the P&L as 1.79769313486232e+308 (or inf/nan once that
+        # value has been through arithmetic).
+        if not math.isfinite(unrealized_pnl) or \
+                abs(unrealized_pnl) > 1000000000000:
             unrealized_pnl = 0
-        if abs(realized_pnl) > 1000000000000:
+        if not math.isfinite(realized_pnl) or \
+                abs(realized_pnl) > 1000000000000:
             realized_pnl = 0
         holding = Holding(account_name, contract.local_symbol)
-        holding.milliseconds = int(time.time() * 1000)
+        # Portfolio rows arrive in a burst during the initial download;
+        # share one clock reading across every row in the iteration
+        holding.milliseconds = self.__now__()
         holding.quantity = position
         holding.market_price = market_price
         holding.market_value = market_value
@@ -360,8 +463,7 @@ class ClientAdapter(ibcs.ClientSocket):
         holding.realized = realized_pnl
         self.client.on_holding(contract, holding)
 
-    @asyncio.coroutine
-    def update_unknown(self, *args):
+    async def update_unknown(self, *args):
         """Callback for updated known data that does not match any existing
         callbacks.
 
@@ -369,15 +471,40 @@ class ClientAdapter(ibcs.ClientSocket):
         raise NotImplementedError()
 
 
+def get_key(contract):
+    """Return the (symbol, currency) key used to route requests for the
+    specified contract. A tuple hashes its already-existing member strings
+    directly, where the old 'symbol.currency' form allocated and hashed a
+    fresh formatted string. The key is computed once and cached on the
+    contract so hot dispatch paths pay a single attribute load.
+
+    Keyword arguments:
+    contract -- ibapipy.data.contract.Contract object
+
+    """
+    key = getattr(contract, '_cached_key', None)
+    if key is None:
+        key = (contract.symbol, contract.currency)
+        try:
+            contract._cached_key = key
+        except AttributeError:
+            # Contract may use __slots__; fall back to building per call
+            pass
+    return key
+
+
 def copy_tick(tick):
-    """Returns a copy of the specified tick.
+    """Returns a copy of the specified tick. The copy is made by cloning the
+    attribute dict onto a bare instance; running Tick.__init__ first would
+    only set defaults that are immediately overwritten, and this runs once
+    per accepted tick.
 
     Keyword arguments:
     tick -- ibapipy.data.tick.Tick object
 
     """
-    result = Tick(tick.local_symbol, tick.milliseconds)
-    result.__dict__.update(tick.__dict__)
+    result = Tick.__new__(Tick)
+    result.__dict__ = tick.__dict__.copy()
     return result
 
 
@@ -7,7 +7,6 @@ for basic testing.
 """
 import asyncio
 import logging
-import time
 import unittest
 import ibapipy.data.contract as ibc
 import ibapipy.data.order as ibo
@@ -115,10 +114,9 @@ class ClientTests(unittest.TestCase):
         client = Client(self.loop)
         self.loop.run_until_complete(client.connect())
         historical_ticks = []
-        @asyncio.coroutine
-        def get_history():
+        async def get_history():
             while True:
-                blocks_left, ticks = yield from client.get_next_history_block(
+                blocks_left, ticks = await client.get_next_history_block(
                         TEST_CONTRACT, '2015-01-15 10:00', '2015-01-15 11:00',
                         'US/Eastern')
                 if ticks is None:
@@ -132,15 +130,14 @@ class ClientTests(unittest.TestCase):
         client = Client(self.loop)
         self.loop.run_until_complete(client.connect())
         realtime_ticks = []
-        @asyncio.coroutine
-        def get_ticks():
+        async def get_ticks():
             while True:
-                tick = yield from client.get_next_tick(TEST_CONTRACT)
+                tick = await client.get_next_tick(TEST_CONTRACT)
                 if tick is None:
                     break
                 realtime_ticks.append(tick)
                 if len(realtime_ticks) == 3:
-                    yield from client.cancel_ticks(TEST_CONTRACT)
+                    await client.cancel_ticks(TEST_CONTRACT)
         self.loop.run_until_complete(get_ticks())
         self.loop.run_until_complete(client.disconnect())
         self.assertTrue(len(realtime_ticks) >= 3)
@@ -14,6 +14,10 @@ PORT = 4001
 # Number used to identify a client connection.
 CLIENT_ID = 0
 
+# Seconds to wait for the unsolicited "next valid ID" that TWS sends after
+# the connection handshake before falling back to an explicit request.
+CONNECT_ID_TIMEOUT = 5
+
 
 # *****************************************************************************
 # HISTORICAL DATA
@@ -45,6 +49,38 @@ MAX_BLOCK_SIZE = 1800
 # Number of seconds to wait between requests to avoid a "pacing violation."
 WAIT_SECONDS = 20
 
+# Maximum number of historical data requests that may be in-flight at once.
+# IB allows a small number of concurrent requests before reporting a "too
+# many requests" error.
+MAX_CONCURRENT_HISTORY = 3
+
+# Maximum number of completed historical blocks held for a slow consumer
+# before the adapter blocks on delivery.
+HISTORY_QUEUE_MAX = 8
+
+
+# *****************************************************************************
+# REALTIME DATA
+# *****************************************************************************
+
+# Maximum number of undelivered ticks buffered per market data request. A
+# slow consumer applies backpressure to the adapter instead of ballooning
+# memory.
+TICK_QUEUE_MAX = 1024
+
+
+# *****************************************************************************
+# CONTRACTS
+# *****************************************************************************
+
+# Number of seconds a resolved contract may be served from the cache before
+# a fresh req_contract_details round trip is made. Contract definitions
+# change rarely (corporate actions, expiries), so this can be generous.
+CONTRACT_CACHE_TTL = 3600
+
+# Maximum number of resolved contracts to keep cached.
+CONTRACT_CACHE_SIZE = 128
+
 
 # *****************************************************************************
 # COMMISSIONS
@@ -1,9 +1,27 @@
 """Date and time translation functions."""
 import calendar
+import functools
 import pytz
 import time
 
 
+# Timezone used as the reference point for all conversions
+UTC = pytz.timezone('UTC')
+
+
+@functools.lru_cache(maxsize=64)
+def get_timezone(timezone):
+    """Returns the pytz timezone object for the specified timezone name.
+    pytz builds timezone objects by reading the zoneinfo database, so the
+    results are cached rather than reconstructed on every conversion.
+
+    Keyword arguments:
+    timezone -- timezone string
+
+    """
+    return pytz.timezone(timezone)
+
+
 def ms_to_datetime(milliseconds, timezone='UTC'):
     """Converts the specified time in milliseconds to a datetime object in
     the given timezone.
@@ -19,8 +37,10 @@ def ms_to_datetime(milliseconds, timezone='UTC'):
     dtime = pytz.datetime.datetime(gmtime.tm_year, gmtime.tm_mon,
                                    gmtime.tm_mday, gmtime.tm_hour,
                                    gmtime.tm_min, gmtime.tm_sec, microseconds,
-                                   pytz.timezone('UTC'))
-    return dtime.astimezone(pytz.timezone(timezone))
+                                   UTC)
+    if timezone == 'UTC':
+        return dtime
+    return dtime.astimezone(get_timezone(timezone))
 
 
 def ms_to_str(milliseconds, timezone='UTC', formatting='%Y-%m-%d %H:%M:%S.%f'):
@@ -35,20 +55,12 @@ def ms_to_str(milliseconds, timezone='UTC', formatting='%Y-%m-%d %H:%M:%S.%f'):
     formatting   -- formatting string (default: '%Y-%m-%d %H:%M:%S.%f')
 
     """
-    seconds = int(milliseconds / 1000)
-    microseconds = int((milliseconds % 1000) * 1000)
-    gmtime = time.gmtime(seconds)
-    dtime = pytz.datetime.datetime(gmtime.tm_year, gmtime.tm_mon,
-                                   gmtime.tm_mday, gmtime.tm_hour,
-                                   gmtime.tm_min, gmtime.tm_sec, microseconds,
-                                   pytz.timezone('UTC'))
-    dtime = dtime.astimezone(pytz.timezone(timezone))
-    return dtime.strftime(formatting)
+    return ms_to_datetime(milliseconds, timezone).strftime(formatting)
 
 
 def now():
     """Returns the current time in milliseconds since the Epoch."""
-    return int(time.time() * 1000)
+    return time.time_ns() // 1000000
 
 
 def str_to_ms(date, timezone='UTC', formatting='%Y-%m-%d %H:%M:%S.%f'):
@@ -60,16 +72,12 @@ def str_to_ms(date, timezone='UTC', formatting='%Y-%m-%d %H:%M:%S.%f'):
     formatting -- formatting string (default: '%Y-%m-%d %H:%M:%S.%f')
 
     """
+    # strptime returns a naive datetime. Note that in order for daylight
+    # savings conversions to work, we MUST use localize() here and cannot
+    # simply pass a timezone into the datetime constructor.
     dtime = pytz.datetime.datetime.strptime(date, formatting)
-    # Note that in order for daylight savings conversions to work, we
-    # MUST use localize() here and cannot simply pass a timezone into the
-    # datetime constructor. This is because derple, werpy, durp, durp ...
-    tzone = pytz.timezone(timezone)
-    dtime = pytz.datetime.datetime(dtime.year, dtime.month, dtime.day,
-                                   dtime.hour, dtime.minute, dtime.second,
-                                   dtime.microsecond)
-    dtime = tzone.localize(dtime)
-    dtime = dtime.astimezone(pytz.timezone('UTC'))
+    dtime = get_timezone(timezone).localize(dtime)
+    dtime = dtime.astimezone(UTC)
     milliseconds = calendar.timegm(dtime.utctimetuple()) * 1000
     milliseconds = int(milliseconds + dtime.microsecond / 1000.0)
     return milliseconds
@@ -64,8 +64,7 @@ def _symbol_to_contract(local_symbol):
         return ibdc.Contract('stk', local_symbol, 'usd', 'smart')
 
 
-@asyncio.coroutine
-def get_history(local_symbol, start_time, end_time):
+async def get_history(local_symbol, start_time, end_time):
     """Download historical prices for the specified symbol.
 
     Keyword arguments:
@@ -78,16 +77,16 @@ def get_history(local_symbol, start_time, end_time):
     # Connect to IB
     print('[{0}] Connecting to client.'.format(local_symbol))
     client = ibc.Client()
-    yield from client.connect()
+    await client.connect()
     # Get a fully populated contract
     basic_contract = _symbol_to_contract(local_symbol)
-    contract = yield from client.get_contract(basic_contract)
+    contract = await client.get_contract(basic_contract)
     # Fetch the history
     msg = '[{0}] Downloading history from {1} to {2}.'
     print(msg.format(local_symbol, start_time, end_time))
     blocks_count, start_ms = 0, ds.now()
     while True:
-        blocks_left, ticks = yield from client.get_next_history_block(
+        blocks_left, ticks = await client.get_next_history_block(
                 contract, start_time, end_time, TIMEZONE)
         if ticks is None:
             break
@@ -98,12 +97,11 @@ def get_history(local_symbol, start_time, end_time):
         mins_left = blocks_left * mean_time / 60000
         msg = '[{0}] {1:3,d} blocks, {2:5.2f} minutes remainining.'
         print(msg.format(local_symbol, blocks_left, mins_left))
-    yield from client.disconnect()
+    await client.disconnect()
     print('Downloaded {0} ticks'.format(len(result)))
 
 
-@asyncio.coroutine
-def get_history_day(local_symbol, day):
+async def get_history_day(local_symbol, day):
     """Download historical prices for the specified symbol.
 
     Keyword arguments:
@@ -115,7 +113,7 @@ def get_history_day(local_symbol, day):
     start_ms, end_ms = _ms_bounds(local_symbol, day)
     start_time = ds.ms_to_str(start_ms, TIMEZONE, '%Y-%m-%d %H:%M')
     end_time = ds.ms_to_str(end_ms + 1000, TIMEZONE, '%Y-%m-%d %H:%M')
-    yield from get_history(local_symbol, start_time, end_time)
+    await get_history(local_symbol, start_time, end_time)
 
 
 if __name__ == "__main__":
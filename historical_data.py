@@ -2,6 +2,7 @@
 Interactive Brokers without having a pacing violation.
 
 """
+import functools
 import ibapipy.data.contract as ibc
 import ibclientpy.config as config
 import ibclientpy.date_support as ds
@@ -85,20 +86,38 @@ def create_request(contract, bar_time, bar_count):
     return result
 
 
+@functools.lru_cache(maxsize=1024)
+def build_basic_contract(sec_type, symbol, currency, exchange):
+    """Return a "basic" contract populated with the specified core
+    attributes. Results are memoized since the contract is a pure function
+    of its arguments.
+
+    Keyword arguments:
+    sec_type -- security type
+    symbol   -- ticker symbol
+    currency -- currency
+    exchange -- exchange
+
+    """
+    result = ibc.Contract()
+    result.sec_type = sec_type
+    result.symbol = symbol
+    result.currency = currency
+    result.exchange = exchange
+    return result
+
+
 def get_basic_contract(contract):
     """TWS is complaining if we provide a fully populated contract. Here we
-    we strip away everything but the core attributes.
+    we strip away everything but the core attributes. Stripped contracts are
+    cached and shared since TWS only reads the core attributes.
 
     Keyword arguments:
     contract -- ibapipy.data.contract.Contract object
 
     """
-    result = ibc.Contract()
-    result.sec_type = contract.sec_type
-    result.symbol = contract.symbol
-    result.currency = contract.currency
-    result.exchange = contract.exchange
-    return result
+    return build_basic_contract(contract.sec_type, contract.symbol,
+                                contract.currency, contract.exchange)
 
 
 def get_parameters(contract, start_date, end_date, timezone):
@@ -7,6 +7,7 @@ import asyncio
 import logging
 import ibapipy.data.execution as ibe
 import ibclientpy.client
+import ibclientpy.client_adapter as ibca
 import ibclientpy.commissions as comms
 import ibclientpy.config as config
 
@@ -36,8 +37,7 @@ class OfflineClient(ibclientpy.client.Client):
     # Internal Methods
     # *************************************************************************
 
-    @asyncio.coroutine
-    def __handle_orders__(self, tick):
+    async def __handle_orders__(self, tick):
         """Process orders based on the specified incoming tick.
 
         Keyword arguments:
@@ -55,11 +55,11 @@ class OfflineClient(ibclientpy.client.Client):
         for order, price in need_filled:
             cancel_id = fill_order(order, self.contract, price,
                                    tick.milliseconds,
-                                   self.order_handler.child_orders)
+                                   self.order_handler.brackets)
             if cancel_id >= 0 and cancel_id in self.order_handler.orders:
                 self.order_handler.orders[cancel_id].status = 'cancelled'
             # Update the status
-            yield from self.adapter.order_status(
+            await self.adapter.order_status(
                 order.order_id, order.status, order.filled, order.remaining,
                 order.avg_fill_price, order.perm_id, order.parent_id,
                 order.avg_fill_price, order.client_id, order.why_held)
@@ -68,9 +68,8 @@ class OfflineClient(ibclientpy.client.Client):
     # Connection
     # *************************************************************************
 
-    @asyncio.coroutine
-    def connect(self, host=config.HOST, port=config.PORT,
-                client_id=config.CLIENT_ID):
+    async def connect(self, host=config.HOST, port=config.PORT,
+                      client_id=config.CLIENT_ID):
         """Connect to the remote TWS.
 
         Keyword arguments:
@@ -81,13 +80,11 @@ class OfflineClient(ibclientpy.client.Client):
         """
         pass
 
-    @asyncio.coroutine
-    def disconnect(self):
+    async def disconnect(self):
         """Disconnect from the remote TWS."""
         pass
 
-    @asyncio.coroutine
-    def is_connected(self):
+    async def is_connected(self):
         """Return True if the Client is connected; False, otherwise."""
         return False
 
@@ -95,15 +92,13 @@ class OfflineClient(ibclientpy.client.Client):
     # Accounts
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_account_name(self):
+    async def get_account_name(self):
         """Return the account name associated with this session as a string.
 
         """
         pass
 
-    @asyncio.coroutine
-    def get_account(self, account_name):
+    async def get_account(self, account_name):
         """Return the ibapipy.data.account.Account instance associated with the
         specified account name.
 
@@ -117,8 +112,7 @@ class OfflineClient(ibclientpy.client.Client):
     # Contracts
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_contract(self, contract):
+    async def get_contract(self, contract):
         """Return a fully populated ibapipy.data.contract.Contract instance
         from the specified "basic" Contract. The specified contract should
         be populated with the 'sec_type', 'symbol', 'currency', and 'exchange'
@@ -134,8 +128,7 @@ class OfflineClient(ibclientpy.client.Client):
     # Orders
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_orders(self):
+    async def get_orders(self):
         """Return a tuple of ibapipy.data.order.Order instances with additional
         attributes on each order. Each order has a 'contract' field and
         'executions' field added to it where the contract is the underlying
@@ -145,8 +138,8 @@ class OfflineClient(ibclientpy.client.Client):
         """
         return tuple(self.order_handler.orders.values())
 
-    @asyncio.coroutine
-    def place_order(self, contract, order, profit_offset=0, loss_offset=0):
+    async def place_order(self, contract, order, profit_offset=0,
+                          loss_offset=0):
         """Place an order for the specified contract. If profit offset or loss
         offset is non-zero, a corresponding order will be placed after the
         parent order has been filled.
@@ -177,13 +170,13 @@ class OfflineClient(ibclientpy.client.Client):
             order.status = 'presubmitted'
         order.contract = contract
         order.executions = []
-        self.order_handler.add_order(order, profit_offset, loss_offset)
+        self.order_handler.add_order(order, contract, profit_offset,
+                                     loss_offset)
         self.order_handler.orders[req_id] = order
-        yield from self.adapter.open_order(req_id, contract, order)
+        await self.adapter.open_order(req_id, contract, order)
         return req_id
 
-    @asyncio.coroutine
-    def cancel_order(self, req_id):
+    async def cancel_order(self, req_id):
         """Cancel the order associated with the specified request ID.
 
         Keyword arguments:
@@ -198,8 +191,7 @@ class OfflineClient(ibclientpy.client.Client):
     # Pricing
     # *************************************************************************
 
-    @asyncio.coroutine
-    def get_next_history_block(self, contract, start, end, timezone):
+    async def get_next_history_block(self, contract, start, end, timezone):
         """Return the next available block of historical ticks for the
         specified contract and time period. The result will be of the form
         (int, tuple) where "int" is the number of blocks remaining to be filled
@@ -221,13 +213,11 @@ class OfflineClient(ibclientpy.client.Client):
         """
         pass
 
-    @asyncio.coroutine
-    def cancel_history(self):
+    async def cancel_history(self):
         """Stop receiving ticks from the get_next_history_block() method."""
         pass
 
-    @asyncio.coroutine
-    def get_next_tick(self, contract):
+    async def get_next_tick(self, contract):
         """Return the next available realtime tick for the specified contract.
         If no more ticks are available (e.g. cancel_ticks() has been called),
         None will be returned.
@@ -238,7 +228,7 @@ class OfflineClient(ibclientpy.client.Client):
         """
         if self.offline_ticks.qsize() == 0:
             return None
-        key = '{0}.{1}'.format(contract.symbol, contract.currency)
+        key = ibca.get_key(contract)
         # Get the request ID for the active market data stream
         if key in self.adapter.market_data_ids:
             req_id = self.adapter.market_data_ids[key]
@@ -249,7 +239,7 @@ class OfflineClient(ibclientpy.client.Client):
             self.id_contracts[req_id] = contract
         # Pull from the queue
         if self.offline_ticks.qsize() > 0:
-            tick = yield from self.offline_ticks.get()
+            tick = await self.offline_ticks.get()
         else:
             tick = None
         # If the tick is None, we're done so remove the old request ID
@@ -257,14 +247,13 @@ class OfflineClient(ibclientpy.client.Client):
             self.adapter.market_data_ids.pop(key)
         # ... otherwise process orders
         else:
-            yield from self.__handle_orders__(tick)
+            await self.__handle_orders__(tick)
         return tick
 
-    @asyncio.coroutine
-    def cancel_ticks(self):
+    async def cancel_ticks(self):
         """Stop receiving ticks from the get_next_tick() method."""
         while self.offline_ticks.qsize() > 0:
-            yield from self.offline_ticks.get()
+            await self.offline_ticks.get()
 
 
 def create_execution(order, milliseconds):
@@ -334,7 +323,7 @@ def fill_order(order, contract, price, milliseconds, oca_relations):
     local_symbol  -- ticker symbol
     price         -- fill price
     milliseconds  -- fill time in milliseconds since the Epoch
-    oca_relations -- dictionary of OCA relationships
+    oca_relations -- dictionary of BracketStates by parent order ID
 
     """
     # Fill the order
@@ -345,10 +334,9 @@ def fill_order(order, contract, price, milliseconds, oca_relations):
     # Try to find the other order in the OCA group
     oca_id = -1
     if order.oca_group != '' and order.oca_group in oca_relations:
-        parent_key = order.oca_group
-        profit_id, loss_id = oca_relations[parent_key]
-        if order.order_id == profit_id:
-            oca_id = loss_id
+        state = oca_relations[order.oca_group]
+        if order.order_id == state.profit_id:
+            oca_id = state.loss_id
         else:
-            oca_id = profit_id
+            oca_id = state.profit_id
     return oca_id
@@ -1,5 +1,7 @@
 """Provide a mechanism for keeping track of orders."""
+from collections import defaultdict
 import asyncio
+import copy
 import logging
 import ibapipy.data.order as ibo
 
@@ -7,16 +9,67 @@ import ibapipy.data.order as ibo
 LOG = logging.getLogger(__name__)
 
 
+def __bracket_template__(order_type):
+    """Return a prototype bracket order of the specified type. Fields common
+    to every bracket order are preset so update_brackets() can shallow-copy
+    the prototype instead of paying Order.__init__'s per-field defaults on
+    each fill.
+
+    Keyword arguments:
+    order_type -- order type ('lmt' or 'stp')
+
+    """
+    template = ibo.Order('sell', 0, order_type)
+    template.oca_type = 2
+    template.tif = 'gtc'
+    return template
+
+
+# Prototypes for the take profit (limit) and stop loss (stop) orders
+PROFIT_TEMPLATE = __bracket_template__('lmt')
+LOSS_TEMPLATE = __bracket_template__('stp')
+
+
+class BracketState:
+    """Bracket bookkeeping for a single parent order.
+
+    Attributes not specified in the constructor:
+    profit_id -- order_id of the profit (limit) child order or -1
+    loss_id   -- order_id of the loss (stop) child order or -1
+    placed    -- True once the bracket orders have been placed
+
+    """
+
+    __slots__ = ('contract', 'profit_offset', 'loss_offset', 'profit_id',
+                 'loss_id', 'placed')
+
+    def __init__(self, contract=None, profit_offset=0, loss_offset=0):
+        """Initialize a new instance of a BracketState.
+
+        Keyword arguments:
+        contract      -- contract being traded by the parent order
+                         (default: None)
+        profit_offset -- profit target offset from parent's fill price
+                         (default: 0)
+        loss_offset   -- loss target offset from parent's fill price
+                         (default: 0)
+
+        """
+        self.contract = contract
+        self.profit_offset = profit_offset
+        self.loss_offset = loss_offset
+        self.profit_id = -1
+        self.loss_id = -1
+        self.placed = False
+
+
 class OrderHandler:
     """Provide a mechanism for keeping track of orders.
 
     Attributes not specified in the constructor:
-    bracket_parms -- dictionary of {parent_id: (profit amt, loss amt), ...}
-    child_orders  -- dictionary of {parent_id: [child1_id, ...], ...}
-    executions    -- dictionary of {perm_id: {exec_id1: execution1, ...}, ...}
-    orders        -- dictionary of {order_id: order, ...}
-    parent_orders -- dictionary of {child_id: parent_id, ...}
-    orders        -- dictionary of orders by order ID
+    brackets   -- dictionary of {parent_id: BracketState, ...}
+    executions -- dictionary of {perm_id: {exec_id1: execution1, ...}, ...}
+    orders     -- dictionary of {order_id: order, ...}
 
     """
 
@@ -28,26 +81,9 @@ class OrderHandler:
 
         """
         self.client = client
-        self.bracket_parms = {}
-        self.child_orders = {}
-        self.executions = {}
+        self.brackets = {}
+        self.executions = defaultdict(dict)
         self.orders = {}
-        self.parent_orders = {}
-
-    def __add_relation__(self, parent_id, child_id):
-        """Update the child_orders and parent_orders dictionaries with the
-        specified relationship.
-
-        Keyword arguments:
-        parent_id -- parent order's order_id
-        child_id  -- child order's order_id
-
-        """
-        if parent_id not in self.child_orders:
-            self.child_orders[parent_id] = []
-        if child_id not in self.child_orders[parent_id]:
-            self.child_orders[parent_id].append(child_id)
-        self.parent_orders[child_id] = parent_id
 
     def add_execution(self, execution):
         """Add the specified execution to this handler.
@@ -56,19 +92,17 @@ class OrderHandler:
         execution -- ibapipy.data.execution.Execution instance
 
         """
-        perm_id = execution.perm_id
-        exec_id = execution.exec_id
-        if perm_id not in self.executions:
-            self.executions[perm_id] = {}
-        self.executions[perm_id][exec_id] = execution
+        self.executions[execution.perm_id][execution.exec_id] = execution
 
-    def add_order(self, order, profit_offset=0, loss_offset=0):
+    def add_order(self, order, contract=None, profit_offset=0,
+                  loss_offset=0):
         """Add the specified order to this handler. If profit_offset or
         loss_offset are non-zero, a corresponding limit or stop order will be
         automatically placed after the parent order has been filled.
 
         Keyword arguments:
         order         -- ibapipy.data.order.Order instance
+        contract      -- contract being traded by the order (default: None)
         profit_offset -- profit target offset from parent's fill price
                          (default: 0)
         loss_offset   -- loss target offset from parent's fill price
@@ -76,7 +110,8 @@ class OrderHandler:
 
         """
         self.orders[order.order_id] = order
-        self.bracket_parms[order.order_id] = (profit_offset, loss_offset)
+        self.brackets[order.order_id] = BracketState(contract, profit_offset,
+                                                     loss_offset)
 
     def update_order(self, req_id, contract, order):
         """Update the order with the specified request/order id.
@@ -89,15 +124,13 @@ class OrderHandler:
         # Add/replace the order
         order.contract = contract
         self.orders[req_id] = order
-        # Associate any executions
-        perm_id = order.perm_id
-        order.executions = []
-        if perm_id in self.executions:
-            for exec_id in self.executions[perm_id]:
-                order.executions.append(self.executions[perm_id][exec_id])
-
-    @asyncio.coroutine
-    def update_brackets(self, parent):
+        # Associate any executions; use get() so a miss does not create an
+        # empty defaultdict entry
+        executions = self.executions.get(order.perm_id)
+        order.executions = [] if executions is None else \
+            list(executions.values())
+
+    async def update_brackets(self, parent):
         """Place a take profit (limit) and stop loss (stop) around the
         specified parent order's fill price.
 
@@ -105,38 +138,35 @@ class OrderHandler:
         parent -- ibapipy.data.order.Order object for the parent order
 
         """
-        if parent.order_id not in self.bracket_parms:
-            return
-        if parent.order_id not in self.client.id_contracts:
-            return
-        if parent.status != 'filled' or parent.avg_fill_price == 0:
+        state = self.brackets.get(parent.order_id)
+        if state is None or state.placed or state.contract is None or \
+                parent.status != 'filled' or parent.avg_fill_price == 0:
             return
+        contract = state.contract
         action = 'sell' if parent.action == 'buy' else 'buy'
         direction = 1 if parent.action == 'buy' else -1
-        profit_offset, loss_offset = self.bracket_parms.pop(parent.order_id)
-        contract = self.client.id_contracts[parent.order_id]
+        state.placed = True
         oca_group = str(parent.perm_id)
         # Profit order
-        if profit_offset != 0:
+        if state.profit_offset != 0:
             limit_price = parent.avg_fill_price + \
-                abs(profit_offset) * direction
-            profit_order = ibo.Order(action, parent.total_quantity, 'lmt',
-                                     lmt_price=limit_price)
+                abs(state.profit_offset) * direction
+            profit_order = copy.copy(PROFIT_TEMPLATE)
+            profit_order.action = action
+            profit_order.total_quantity = parent.total_quantity
+            profit_order.lmt_price = limit_price
             profit_order.oca_group = oca_group
-            profit_order.oca_type = 2
-            profit_order.tif = 'gtc'
-            profit_id = yield from self.client.place_order(contract,
-                                                           profit_order)
-            self.__add_relation__(parent.order_id, profit_id)
+            state.profit_id = await self.client.place_order(contract,
+                                                            profit_order)
         # Loss order
-        if loss_offset != 0:
-            stop_price = parent.avg_fill_price - abs(loss_offset) * direction
-            loss_order = ibo.Order(action, parent.total_quantity, 'stp',
-                                   aux_price=stop_price)
+        if state.loss_offset != 0:
+            stop_price = parent.avg_fill_price - \
+                abs(state.loss_offset) * direction
+            loss_order = copy.copy(LOSS_TEMPLATE)
+            loss_order.action = action
+            loss_order.total_quantity = parent.total_quantity
+            loss_order.aux_price = stop_price
             loss_order.oca_group = oca_group
-            loss_order.oca_type = 2
-            loss_order.tif = 'gtc'
-            loss_id = yield from self.client.place_order(contract,
-                                                         loss_order)
-            self.__add_relation__(parent.order_id, loss_id)
+            state.loss_id = await self.client.place_order(contract,
+                                                          loss_order)
 